@@ -0,0 +1,109 @@
+import numpy as np
+from numba import njit, prange
+
+from main import BASE_DECK, SLOT_PAIRS, SLOT_SIZE, SLOTS, SUIT_MASK, Deck
+
+CARDS_PER_SUIT = Deck.cards_per_suit
+CARDS = len(BASE_DECK)
+EMPTY = 0xFF
+
+# same game as main.Board, but on a uint8[SLOTS, SLOT_SIZE] board with a length per slot
+# removing the top card of a slot only decrements its length, the board itself is never copied
+_PAIRS = np.array(SLOT_PAIRS, dtype=np.int64)
+_BASE_DECK = np.frombuffer(BASE_DECK, dtype=np.uint8)
+
+
+@njit(cache=True)
+def _top(board, lens, i):
+    # an empty slot reads as 0xFF, its suit bits match no real card so it never takes part in a removal
+    return board[i, lens[i] - 1] if lens[i] else EMPTY
+
+
+@njit(cache=True)
+def _remove_cards(board, lens):
+    # the top cards of all slots packed into one word, one byte per slot, so comparisons need no board loads
+    tops = 0
+    for i in range(SLOTS):
+        tops |= np.int64(_top(board, lens, i)) << (8 * i)
+
+    removed_count = 0
+    to_check = True
+    while to_check:
+        to_check = False
+        for p in range(len(_PAIRS)):
+            i1, i2 = _PAIRS[p, 0], _PAIRS[p, 1]
+            card1, card2 = (tops >> (8 * i1)) & 0xFF, (tops >> (8 * i2)) & 0xFF
+            if (card1 ^ card2) & SUIT_MASK == 0 and card1 < card2:  # same suit and lower value
+                lens[i1] -= 1  # remove card
+                tops = tops & ~(0xFF << (8 * i1)) | np.int64(_top(board, lens, i1)) << (8 * i1)
+                removed_count += 1
+                to_check = True
+                break
+    return removed_count
+
+
+@njit(cache=True)
+def _check_best_to_move(board, lens):
+    # moving a card and removing no others (max_rem_count = 0) is better than not moving (max_rem_count = -1)
+    max_removed_count, slot_nr = -1, -1
+    for i in range(SLOTS):  # slot to take from
+        if not lens[i] > 1:
+            continue  # cannot take from empty (impossible) or 1 card (superfluous) slot
+
+        sim_lens = lens.copy()
+        sim_lens[i] -= 1  # move top card away
+        removed_count = _remove_cards(board, sim_lens)
+        if removed_count > max_removed_count:
+            max_removed_count, slot_nr = removed_count, i
+    return slot_nr
+
+
+@njit(cache=True)
+def play_deck(deck):
+    board = np.zeros((SLOTS, SLOT_SIZE), np.uint8)
+    lens = np.zeros(SLOTS, np.int64)
+    pos = len(deck)
+    for _ in range(CARDS_PER_SUIT):
+        for i in range(SLOTS):  # put new cards on top, drawn from the end of the deck
+            pos -= 1
+            board[i, lens[i]] = deck[pos]
+            lens[i] += 1
+
+        # remove cards, swap if possible, remove again, swap again, until no further removals
+        to_check = True
+        while to_check:
+            to_check = False
+            _remove_cards(board, lens)
+
+            free_slot = -1
+            for i in range(SLOTS):
+                if lens[i] == 0:
+                    free_slot = i
+                    break
+
+            if free_slot >= 0:
+                slot_nr = _check_best_to_move(board, lens)
+                if slot_nr >= 0:  # move top card to first free slot
+                    lens[slot_nr] -= 1
+                    board[free_slot, 0] = board[slot_nr, lens[slot_nr]]
+                    lens[free_slot] = 1
+                    to_check = True
+    return lens.sum()
+
+
+@njit(cache=True)
+def play_game():
+    deck = _BASE_DECK.copy()
+    for i in range(CARDS - 1, 0, -1):  # Fisher-Yates shuffle
+        j = np.random.randint(0, i + 1)
+        deck[i], deck[j] = deck[j], deck[i]
+    return play_deck(deck)
+
+
+@njit(parallel=True, cache=True)
+def simulate_many(rounds):
+    # games are independent and numba keeps a separate np.random state per thread
+    results = np.empty(rounds, np.int8)
+    for i in prange(rounds):
+        results[i] = play_game()  # every game writes only its own entry
+    return np.bincount(results, minlength=CARDS + 1)
@@ -0,0 +1,148 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count
+from random import getrandbits
+
+from libc.stdint cimport uint8_t, uint64_t
+
+from main import BASE_DECK, SLOT_PAIRS, SLOT_SIZE, SLOTS, SUIT_MASK, Deck
+
+# same game as fast_game, compiled ahead of time by cython for when numba is not available
+# the board is flat like main.Board: slot i holds its cards at [i * SLOT_SIZE, i * SLOT_SIZE + lens[i])
+cdef enum:
+    _SLOTS = 4
+    _SLOT_SIZE = 12
+    _PAIR_COUNT = 12
+    _CARDS = 36
+    _CARDS_PER_SUIT = 9
+    _SUIT_MASK = 0xF0
+
+assert (_SLOTS, _SLOT_SIZE, _PAIR_COUNT, _CARDS, _CARDS_PER_SUIT, _SUIT_MASK) == \
+       (SLOTS, SLOT_SIZE, len(SLOT_PAIRS), len(BASE_DECK), Deck.cards_per_suit, SUIT_MASK)
+
+cdef int pairs[_PAIR_COUNT][2]
+cdef uint8_t base_deck[_CARDS]
+for _p, (_i1, _i2) in enumerate(SLOT_PAIRS):
+    pairs[_p][0], pairs[_p][1] = _i1, _i2
+for _i, _card in enumerate(BASE_DECK):
+    base_deck[_i] = _card
+
+
+cdef inline uint64_t _next_random(uint64_t *state) noexcept nogil:  # xorshift64*
+    state[0] ^= state[0] >> 12
+    state[0] ^= state[0] << 25
+    state[0] ^= state[0] >> 27
+    return state[0] * 0x2545F4914F6CDD1DULL
+
+
+cdef int _remove_cards(const uint8_t *board, int *lens) noexcept nogil:
+    cdef int removed_count = 0, p, i1, i2
+    cdef uint8_t card1, card2
+    cdef bint to_check = True
+    while to_check:
+        to_check = False
+        for p in range(_PAIR_COUNT):
+            i1, i2 = pairs[p][0], pairs[p][1]
+            if lens[i1] == 0 or lens[i2] == 0:
+                continue  # ignore empty slot
+
+            card1, card2 = board[i1 * _SLOT_SIZE + lens[i1] - 1], board[i2 * _SLOT_SIZE + lens[i2] - 1]
+            if (card1 ^ card2) & _SUIT_MASK == 0 and card1 < card2:  # same suit and lower value
+                lens[i1] -= 1  # remove card
+                removed_count += 1
+                to_check = True
+                break
+    return removed_count
+
+
+cdef int _check_best_to_move(const uint8_t *board, const int *lens) noexcept nogil:
+    # moving a card and removing no others (max_rem_count = 0) is better than not moving (max_rem_count = -1)
+    cdef int max_removed_count = -1, slot_nr = -1, removed_count, i, j
+    cdef int sim_lens[_SLOTS]
+    for i in range(_SLOTS):  # slot to take from
+        if not lens[i] > 1:
+            continue  # cannot take from empty (impossible) or 1 card (superfluous) slot
+
+        for j in range(_SLOTS):
+            sim_lens[j] = lens[j]
+        sim_lens[i] -= 1  # move top card away
+        removed_count = _remove_cards(board, sim_lens)
+        if removed_count > max_removed_count:
+            max_removed_count, slot_nr = removed_count, i
+    return slot_nr
+
+
+cdef int _play_deck(const uint8_t *deck) noexcept nogil:
+    cdef uint8_t board[_SLOTS * _SLOT_SIZE]
+    cdef int lens[_SLOTS]
+    cdef int pos = _CARDS, count = 0, free_slot, slot_nr, i, _
+    cdef bint to_check
+    for i in range(_SLOTS):
+        lens[i] = 0
+
+    for _ in range(_CARDS_PER_SUIT):
+        for i in range(_SLOTS):  # put new cards on top, drawn from the end of the deck
+            pos -= 1
+            board[i * _SLOT_SIZE + lens[i]] = deck[pos]
+            lens[i] += 1
+
+        # remove cards, swap if possible, remove again, swap again, until no further removals
+        to_check = True
+        while to_check:
+            to_check = False
+            _remove_cards(board, lens)
+
+            free_slot = -1
+            for i in range(_SLOTS):
+                if lens[i] == 0:
+                    free_slot = i
+                    break
+
+            if free_slot >= 0:
+                slot_nr = _check_best_to_move(board, lens)
+                if slot_nr >= 0:  # move top card to first free slot
+                    lens[slot_nr] -= 1
+                    board[free_slot * _SLOT_SIZE] = board[slot_nr * _SLOT_SIZE + lens[slot_nr]]
+                    lens[free_slot] = 1
+                    to_check = True
+
+    for i in range(_SLOTS):
+        count += lens[i]
+    return count
+
+
+cdef int _play_game(uint64_t *state) noexcept nogil:
+    cdef uint8_t deck[_CARDS]
+    cdef int i, j
+    for i in range(_CARDS):
+        deck[i] = base_deck[i]
+    for i in range(_CARDS - 1, 0, -1):  # Fisher-Yates shuffle
+        j = <int>(((_next_random(state) >> 32) * <uint64_t>(i + 1)) >> 32)
+        deck[i], deck[j] = deck[j], deck[i]
+    return _play_deck(deck)
+
+
+def play_deck(const unsigned char[::1] deck):
+    assert deck.shape[0] == _CARDS
+    return _play_deck(&deck[0])
+
+
+def _simulate_chunk(long rounds, uint64_t seed):
+    cdef long y[_CARDS + 1]
+    cdef uint64_t state = seed | 1  # xorshift state must not be zero
+    cdef long i
+    for i in range(_CARDS + 1):
+        y[i] = 0
+    with nogil:  # lets the other chunks run in parallel
+        for i in range(rounds):
+            y[_play_game(&state)] += 1
+    return [y[i] for i in range(_CARDS + 1)]
+
+
+def simulate_many(rounds):
+    # games are independent, play one chunk per core on threads, each with its own random state
+    chunks = cpu_count() or 1
+    sizes = [rounds // chunks + (c < rounds % chunks) for c in range(chunks)]
+    with ThreadPoolExecutor(chunks) as pool:
+        results = list(pool.map(_simulate_chunk, sizes, [getrandbits(64) for _ in range(chunks)]))
+    return [sum(counts) for counts in zip(*results)]
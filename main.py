@@ -1,157 +1,175 @@
-from copy import deepcopy
 from itertools import permutations
 from random import shuffle
 import logging
 import sys
 
 
-class Card:
-    def __init__(self, suit: str, value: int):
-        self._suit = suit
-        self._value = value
+SUITS = ["Schelle", "Schilte", "Eichel", "Rose"]
+SUIT_MASK = 0xF0  # a card is packed into one byte: suit index in the high bits, value in the low bits
+SLOTS = 4
+SLOT_SIZE = 12  # a slot never holds more than the 9 dealt cards, leave some headroom
+SLOT_PAIRS = tuple(permutations(range(SLOTS), 2))  # all ordered pairs of slots to compare top cards of
+# pairs left to scan after pair nr p removed the top card of slot s: RESCAN_PAIRS[p][s]
+# pairs before p without s were found not removable and their top cards did not change since
+RESCAN_PAIRS = tuple(
+    tuple(tuple((q, i1, i2) for q, (i1, i2) in enumerate(SLOT_PAIRS) if q >= p or s in (i1, i2))
+          for s in range(SLOTS))
+    for p in range(len(SLOT_PAIRS)))
 
-    def __str__(self):
-        return self._suit[:4] + ":" + str(self._value).rjust(2, " ")
 
-    def lower(self, other):
-        if not isinstance(other, Card):
-            return False
-        if self._suit != other._suit:
-            return False
-        return self._value < other._value
+def card_str(card: int):
+    return SUITS[card >> 4][:4] + ":" + str(card & 0x0F).rjust(2, " ")
 
 
 class Deck:
+    __slots__ = ("_cards", "_pos")
     cards_per_suit = 9
     min_value = 6
 
     def __init__(self):
-        self._cards = []
-        for suit in ["Schelle", "Schilte", "Eichel", "Rose"]:
-            min_val = Deck.min_value
-            max_val = min_val + Deck.cards_per_suit
-            for value in range(min_val, max_val):
-                self._cards.append(Card(suit, value))
+        self._cards = bytearray(BASE_DECK)
         shuffle(self._cards)
+        self._pos = len(self._cards)  # cards are drawn from the end, [0, pos) are still in the deck
 
     def draw(self):
-        return self._cards.pop()
+        self._pos -= 1
+        return self._cards[self._pos]
+
+
+BASE_DECK = bytes(suit << 4 | value
+                  for suit in range(len(SUITS))
+                  for value in range(Deck.min_value, Deck.min_value + Deck.cards_per_suit))
+CARD_STRS = {card: card_str(card) for card in BASE_DECK}  # formatted once, looked up when printing the board
 
 
 class Board:
+    __slots__ = ("_board", "_lens", "_deck")
+
     def __init__(self):
-        self._slots = [[], [], [], []]
+        # all slots in one buffer, slot i holds its cards bottom to top at [i * SLOT_SIZE, i * SLOT_SIZE + lens[i])
+        self._board = bytearray(SLOTS * SLOT_SIZE)
+        self._lens = [0] * SLOTS
         self._deck = Deck()
 
     def __str__(self):
         s = []
-        max_per_slot = max(len(slot) for slot in self._slots)
-        for i in range(max_per_slot):
+        for i in range(max(self._lens)):
             sl = []
-            for slot in self._slots:
-                if i < len(slot):
-                    sl.append(str(slot[i]))
+            for slot_nr, length in enumerate(self._lens):
+                if i < length:
+                    sl.append(CARD_STRS[self._board[slot_nr * SLOT_SIZE + i]])
                 else:
                     sl.append("....:..")
             s.append(" - ".join(sl))
         return "\n".join(s)
 
-    def _remove_cards(self, simulate: bool):
-        if simulate:
-            slots = deepcopy(self._slots)
-        else:
-            slots = self._slots
+    def _push(self, slot_nr: int, card: int):
+        self._board[slot_nr * SLOT_SIZE + self._lens[slot_nr]] = card
+        self._lens[slot_nr] += 1
 
-        # check for removals
+    def _pop(self, slot_nr: int):
+        self._lens[slot_nr] -= 1
+        return self._board[slot_nr * SLOT_SIZE + self._lens[slot_nr]]
+
+    def _count_removals(self, lens: list):
+        # removes cards by shortening lens only, the cards on the board are left untouched
+        board = self._board
         removed_count = 0
+        pairs = RESCAN_PAIRS[0][0]  # all pairs
         to_check = True
         while to_check:
-            for i1, i2 in permutations(range(len(slots)), 2):
-                if not len(slots[i1]) or not len(slots[i2]):
+            for p, i1, i2 in pairs:
+                len1, len2 = lens[i1], lens[i2]
+                if not len1 or not len2:
                     continue  # ignore empty slot
 
-                card1, card2 = slots[i1][-1], slots[i2][-1]
-                if card1.lower(card2):
-                    slots[i1].pop()  # remove card
+                card1, card2 = board[i1 * SLOT_SIZE + len1 - 1], board[i2 * SLOT_SIZE + len2 - 1]
+                if (card1 ^ card2) & SUIT_MASK == 0 and card1 < card2:  # same suit and lower value
+                    lens[i1] -= 1  # remove card
                     removed_count += 1
+                    pairs = RESCAN_PAIRS[p][i1]
                     break
 
             else:  # => no cards removed in current round
                 to_check = False
 
-        if not simulate:
-            logging.debug(f"Removed {removed_count} cards.")
+        return removed_count
+
+    def _remove_cards(self):
+        removed_count = self._count_removals(self._lens)
+
+        logging.debug("Removed %d cards.", removed_count)
         return removed_count
 
     def _check_best_to_move(self):
         # check which slot to move to is best
         # moving a card and removing no others (max_rem_count = 0) is better than not moving (max_rem_count = -1)
-        max_removed_count, slot_to_remove_card, slot_nr = -1, None, None
-        to_check = True
-        while to_check:
-            to_check = False
+        max_removed_count, slot_nr = -1, None
+        for i, length in enumerate(self._lens):  # slot to take from
+            if not length > 1:
+                continue  # cannot take from empty (impossible) or 1 card (superfluous) slot
 
-            for i, slot in enumerate(self._slots):  # slot to take from
-                if not len(slot) > 1:
-                    continue  # cannot take from empty (impossible) or 1 card (superfluous) slot
-
-                empty_slot = [slot.pop()]  # move top card to empty slot
-                removed_count = self._remove_cards(simulate=True)  # simulate removal on new board
-                slot.append(empty_slot.pop())  # move card back
-                if removed_count > max_removed_count:
-                    max_removed_count, slot_to_remove_card, slot_nr = removed_count, slot, i
+            lens = self._lens.copy()
+            lens[i] -= 1  # move top card away, then count the removals this exposes
+            removed_count = self._count_removals(lens)
+            if removed_count > max_removed_count:
+                max_removed_count, slot_nr = removed_count, i
 
         if max_removed_count > 0:
-            logging.debug(f"Removing {max_removed_count} cards when swapping from slot nr {slot_nr}")
-        return slot_to_remove_card
+            logging.debug("Removing %d cards when swapping from slot nr %d", max_removed_count, slot_nr)
+        return slot_nr
 
     def play_turn(self):
-        for slot in self._slots:  # put new cards on top
-            slot.append(self._deck.draw())
-        logging.info(f"Played cards:\n{self}")
+        for slot_nr in range(SLOTS):  # put new cards on top
+            self._push(slot_nr, self._deck.draw())
+        logging.info("Played cards:\n%s", self)  # board is only formatted if logged
 
         # remove cards, swap if possible, remove again, swap again, until no further removals
         to_check = True
         while to_check:
             to_check = False
-            _ = self._remove_cards(simulate=False)
-            free_slots = [slot for slot in self._slots if len(slot) == 0]
-            logging.debug(f"After removal:\n{self}")
+            _ = self._remove_cards()
+            free_slot = self._lens.index(0) if 0 in self._lens else None  # first empty slot
+            logging.debug("After removal:\n%s", self)
 
             # check if cards were removed and empty slot exists
-            if len(free_slots) > 0:
-                if slot := self._check_best_to_move():  # check from which slot the top card should be moved now
-                    free_slots[0].append(slot.pop())  # move top card to first free slot
+            if free_slot is not None:
+                slot_nr = self._check_best_to_move()  # check from which slot the top card should be moved now
+                if slot_nr is not None:
+                    self._push(free_slot, self._pop(slot_nr))  # move top card to first free slot
                     to_check = True
 
     def cards_count(self):
-        return sum(len(slot) for slot in self._slots)
+        return sum(self._lens)
 
 
 class Game:
+    __slots__ = ("_board",)
+
     def __init__(self):
         self._board = Board()
-        logging.basicConfig(stream=sys.stdout, filemode='w', level=logging.ERROR)
 
     def play_round(self):
         for _ in range(Deck.cards_per_suit):
             self._board.play_turn()
         c = self._board.cards_count()
-        logging.warning(f"Finished with {c} cards")
+        logging.warning("Finished with %d cards", c)
         return c
 
 
 def simulate():
     import matplotlib.pyplot as plt
-
-    c = 0
-    y = [0] * 37
+    try:
+        from fast_game import simulate_many
+    except ImportError:  # no numba, compile the cython version on first import instead
+        import pyximport
+        pyximport.install(language_level=3)
+        from fast_game_cy import simulate_many
+
+    logging.basicConfig(stream=sys.stdout, filemode='w', level=logging.ERROR)  # once per run, not per game
     rounds = 10**6
-    for i in range(rounds):
-        game = Game()
-        i = game.play_round()
-        y[i] += 1
-        c += i
+    y = simulate_many(rounds)  # games played natively, y[i] = number of games finished with i cards
+    c = sum(i * n for i, n in enumerate(y))
     logging.error(f"Average: {c / rounds}")  # Average: 11.858757
 
     x = range(37)